@@ -0,0 +1,28 @@
+import click
+
+
+@click.group()
+def key():
+    """
+    Manage the OpenAI API key.
+    """
+
+
+@key.command(name="edit")
+def edit_api_key():
+    """
+    Edit the OpenAI API key.
+    """
+    from ..lib import edit_key
+
+    edit_key()
+
+
+@key.command(name="set")
+def set_api_key():
+    """
+    Set the OpenAI API key.
+    """
+    from ..lib import set_key
+
+    set_key()
@@ -0,0 +1,198 @@
+import os
+import sys
+
+import click
+
+from ..cli import MODEL_CHOICES, MODEL_LOOKUP
+
+
+def read_stdin() -> str:
+    """
+    Reads piped or redirected stdin in 64 KiB chunks.
+
+    Reading chunk by chunk avoids one giant blocking allocation when
+    large files are piped into `lmt`.
+    """
+    parts = []
+    file_descriptor = sys.stdin.fileno()
+    while chunk := os.read(file_descriptor, 65536):
+        parts.append(chunk)
+    return b"".join(parts).decode("utf-8", "replace")
+
+
+# The first two parameters are required by Click for a callback.
+def validate_temperature(ctx, param, value):
+    """
+    Validates the temperature parameter.
+    """
+    if 0 <= value <= 2:
+        return value
+
+    raise click.BadParameter("Temperature must be between 0 and 2.")
+
+
+@click.command()
+@click.argument(
+    "prompt_input",
+    type=str,
+    required=False,
+    nargs=-1,
+)
+@click.option(
+    "--model",
+    "-m",
+    default="gpt-3.5-turbo",
+    type=click.Choice(MODEL_CHOICES, case_sensitive=False),
+    help="The model to use for the requests.",
+)
+@click.option(
+    "--template",
+    "-t",
+    help="The template to use for the requests.",
+)
+@click.option(
+    "--system",
+    "-s",
+    default="",
+    help="The system to use for the requests.",
+)
+@click.option("--emoji", is_flag=True, help="Add emotions and emojis.")
+@click.option(
+    "--temperature",
+    callback=validate_temperature,
+    default=1,
+    type=float,
+    help="The temperature to use for the requests.",
+    show_default=True,
+)
+@click.option(
+    "--tokens",
+    is_flag=True,
+    help=("Count the number of tokens in the prompt, and display the cost of the request."),
+)
+@click.option(
+    "--no-stream",
+    is_flag=True,
+    default=False,
+    help="Disable the streaming of the response.",
+)
+@click.option(
+    "--raw",
+    "-r",
+    is_flag=True,
+    default=False,
+    help="Disable colors and formatting, and print the raw response.",
+)
+@click.option(
+    "--rich",
+    "-R",
+    is_flag=True,
+    default=False,
+    help="Force Rich formatting.",
+)
+@click.option(
+    "--debug",
+    is_flag=True,
+    default=False,
+    help="Print debug information.",
+)
+@click.pass_context
+def prompt(
+    ctx,
+    model,
+    template,
+    system,
+    emoji,
+    temperature,
+    tokens,
+    no_stream,
+    raw,
+    rich,
+    prompt_input,
+    debug,
+):
+    """
+    Talk to ChatGPT.
+
+    Example: lmt prompt "Say hello" --emoji
+    """
+    from ..lib import prepare_and_generate_response
+
+    # Resolve aliases (e.g. "4t") to their canonical model name.
+    model = MODEL_LOOKUP[model.lower()]
+
+    # Click hands us a tuple of argv tokens; a string (e.g. from a direct
+    # call) is taken as-is, and empty input skips the strip entirely.
+    if not isinstance(prompt_input, str):
+        prompt_input = " ".join(prompt_input)
+    prompt_input = prompt_input.strip() if prompt_input else ""
+
+    if not sys.stdin.isatty():
+        # Read piped or redirected stdin content exactly once; an extra
+        # prompt on the command line is appended after a separator.
+        piped = read_stdin().rstrip()
+        prompt_input = f"{piped}\n___\n{prompt_input}" if prompt_input else piped
+
+    if not prompt_input:
+        # Allow for structured prompts in the terminal.
+        if sys.stdin.isatty():
+            input_prompt_instructions = (
+                "Write or paste your message below. Use <Enter> for new lines."
+                "\nTo send your message, press Ctrl+D."
+            )
+
+            if sys.stdout.isatty():
+                click.echo(click.style(input_prompt_instructions, fg="yellow"))
+                click.echo("---")
+
+            # Display instructions in the terminal only, not in redirected or piped output.
+            # This ensures the user sees the instructions without affecting the file output.
+            if not sys.stdout.isatty():
+                with open("/dev/tty", "w", encoding="UTF-8") as output_stream:
+                    click.echo(
+                        click.style(input_prompt_instructions, fg="yellow"),
+                        file=output_stream,
+                    )
+                    click.echo("---", file=output_stream)
+
+            # Read user input from stdin
+            prompt_input = sys.stdin.read().strip()
+
+    if system and template:
+        raise click.BadOptionUsage(
+            option_name="template",
+            message=click.style(
+                "You cannot use both `--template` and `--system` at the same time.",
+                fg="red",
+            ),
+        )
+
+    # If *not* in an interactive shell or redirecting to a file,
+    # enable the `--raw` option, viz. disabling `Rich` formatting
+    if not sys.stdout.isatty():
+        raw = True
+
+    # If `--rich` is enabled, force `--raw` to be disabled
+    if rich:
+        raw = False
+
+    # If in an interactive shell, add a new line after the prompt for better readability
+    if sys.stdout.isatty():
+        click.echo()
+
+    prepare_and_generate_response(
+        system,
+        template,
+        model,
+        emoji,
+        prompt_input,
+        temperature,
+        tokens,
+        no_stream,
+        raw,
+        debug,
+    )
+
+    # Same as above (readibility), but after the LLM's response
+    if sys.stdout.isatty():
+        click.echo()
@@ -0,0 +1,174 @@
+import hashlib
+
+import click
+
+from ..templates import (
+    TEMPLATES_DIR,
+    get_default_template_file_path,
+    get_template_names,
+    get_templates_dir,
+)
+
+# Styled once at import: click.style rebuilds the ANSI escape codes on
+# every call, and these prefixes are the same for every invocation.
+_SUCCESS = click.style("Success!", fg="green")
+_ERROR = click.style("Error: ", fg="red")
+_ABORTING = click.style("Aborting: ", fg="red")
+
+
+@click.group()
+def templates():
+    """
+    Manage the templates.
+    """
+
+
+@templates.command("list")
+def print_templates_list():
+    """
+    List the available templates.
+    """
+    for template_name in get_template_names():
+        click.echo(template_name)
+
+
+@templates.command("view")
+@click.argument("template")
+def view_template(template):
+    """
+    View a template.
+    """
+    template = TEMPLATES_DIR / f"{template}.yaml"
+    if template.exists():
+        click.echo(template.read_text(encoding="UTF-8"), nl=False)
+
+
+@templates.command()
+@click.argument("template")
+def edit(template):
+    """
+    Edit a template.
+    """
+    template_file = TEMPLATES_DIR / f"{template}.yaml"
+    if template_file.exists():
+        # Editors rewrite the file on save, so an unchanged (mtime, size)
+        # pair means no edit happened. Some editors rewrite the file even
+        # when nothing changed, so a differing stat falls back to a hash
+        # compare rather than holding two full copies of the content.
+        stats_before = template_file.stat()
+        hash_before = hashlib.blake2b(template_file.read_bytes(), digest_size=16).digest()
+        click.edit(filename=template_file)
+        stats_after = template_file.stat()
+
+        unchanged = (stats_before.st_mtime_ns, stats_before.st_size) == (
+            stats_after.st_mtime_ns,
+            stats_after.st_size,
+        )
+        if not unchanged:
+            hash_after = hashlib.blake2b(template_file.read_bytes(), digest_size=16).digest()
+            unchanged = hash_before == hash_after
+
+        if unchanged:
+            click.echo("No changes were made.")
+        else:
+            click.echo(
+                f"{_SUCCESS} Template"
+                f" {click.style(template, fg='green')} was updated."
+            )
+
+    else:
+        click.echo(
+            _ERROR + f"Template {click.style(template, fg='red')} does not exist."
+        )
+        click.echo(
+            f"Use `{click.style(f'lmt templates add {template}', fg='blue')}` to" " create it."
+        )
+
+
+@templates.command("add")
+@click.argument("template", required=False)
+def add_template(template):
+    """
+    Create a new template
+    """
+    if not template:
+        template = click.prompt("Template name")
+        if (TEMPLATES_DIR / f"{template}.yaml").exists():
+            click.echo(
+                _ERROR + f"Template {click.style(template, fg='red')} already exists."
+            )
+            click.echo(
+                f"Use `{click.style(f'lmt templates edit {template}', fg='blue')}` to" " edit it."
+            )
+            return
+
+    template_file = get_templates_dir() / f"{template}.yaml"
+    default_template_file = get_default_template_file_path()
+
+    # The default template is ~1 KB; a read/write pair beats shutil's
+    # chunked copy loop and drops the shutil import.
+    template_file.write_bytes(default_template_file.read_bytes())
+
+    # Editors rewrite the file on save, so comparing the stat signature
+    # from just after the copy with the one after the editor closes tells
+    # us whether anything was saved, without re-reading either file.
+    stats_before = template_file.stat()
+    click.edit(filename=template_file)
+    stats_after = template_file.stat()
+
+    if (stats_before.st_mtime_ns, stats_before.st_size) == (
+        stats_after.st_mtime_ns,
+        stats_after.st_size,
+    ):
+        click.echo(
+            _ABORTING + "The template has not been created because no changes were made."
+        )
+        template_file.unlink()
+    else:
+        click.echo(
+            f"{_SUCCESS} Template"
+            f" '{click.style(template, fg='green')}' created."
+        )
+
+
+@templates.command("delete")
+@click.argument("template", required=True)
+def delete_template(template):
+    """
+    Delete the template.
+    """
+    template_file = TEMPLATES_DIR / f"{template}.yaml"
+    if template_file.exists():
+        click.confirm(
+            f"Are you sure you want to delete the template '{template}'?",
+            abort=True,
+        )
+        template_file.unlink()
+        click.echo(
+            f"{_SUCCESS} Template"
+            f" '{click.style(template, fg='blue')}' deleted."
+        )
+    else:
+        click.echo(
+            _ERROR + f"The template '{click.style(template, fg='red')}' does not exist."
+        )
+
+
+@templates.command("rename")
+@click.argument("template", required=True)
+def rename_template(template):
+    """
+    Rename the template.
+    """
+    template_file = TEMPLATES_DIR / template
+    if template_file.exists():
+        new_template_name = click.prompt("New template name", default=template)
+        new_template_file = TEMPLATES_DIR / new_template_name
+        template_file.rename(new_template_file)
+        click.echo(
+            f"{_SUCCESS} Template"
+            f" '{click.style(template, fg='blue')}' renamed to"
+            f" '{click.style(new_template_name, fg='green')}'."
+        )
+    else:
+        click.echo(_ERROR + f"The template '{template}' does not exist.")
@@ -1,27 +1,36 @@
+import functools
 import os
 import sys
 import time
 
-import openai
-import tiktoken
-
 BLUE = "\x1b[34m"
 RED = "\x1b[91m"
 RESET = "\x1b[0m"
 
 
 def format_prompt(system_content, user_content):
-    """Returns a formatted prompt for the OpenAI API."""
-    return [
-        {
-            "role": "system",
-            "content": system_content,
-        },
+    """
+    Returns a formatted prompt for the OpenAI API.
+
+    An empty system message is omitted entirely: the API accepts a lone
+    user message, and the system turn's framing would otherwise be billed
+    on every request.
+    """
+    messages = []
+    if system_content:
+        messages.append(
+            {
+                "role": "system",
+                "content": system_content,
+            }
+        )
+    messages.append(
         {
             "role": "user",
             "content": user_content,
-        },
-    ]
+        }
+    )
+    return messages
 
 
 def chatgpt_request(
@@ -38,8 +47,9 @@ def chatgpt_request(
     """
     Sends a request to the OpenAI Chat API.
     """
-    start_time = time.monotonic_ns()
-    openai.api_key = os.getenv("OPENAI_API_KEY")
+    import openai
+
+    start_time = time.perf_counter()
 
     # Make the API request
     response = openai.ChatCompletion.create(
@@ -54,33 +64,45 @@ def chatgpt_request(
     )
 
     if stream:
-        # Create variables to collect the stream of chunks
-        collected_chunks = []
-        collected_messages = []
+        # Only the text is kept: accumulating every chunk dict would cost
+        # memory proportional to the response length for nothing, as the
+        # caller never reads the raw stream back.
+        generated_text_parts = []
+
+        # Hoisted out of the loop; flushing is throttled to one flush per
+        # 50 ms instead of a write+flush round-trip per token.
+        stdout_write = sys.stdout.write
+        last_flush = time.monotonic()
 
         # Iterate through the stream of events
         for chunk in response:
-            collected_chunks.append(chunk)  # save the event response
             chunk_message = chunk["choices"][0]["delta"]  # extract the message
-            if chunk_message is not None:
-                collected_messages.append(chunk_message)  # save the message
+            content = chunk_message.get("content", "")
+            generated_text_parts.append(content)
 
             if update_markdown_stream:
-                update_markdown_stream(chunk_message.get("content", ""))
+                update_markdown_stream(content)
             else:
-                print(chunk_message.get("content", ""), end="")
-        response = collected_chunks
+                stdout_write(content)
+                now = time.monotonic()
+                if now - last_flush >= 0.05:
+                    sys.stdout.flush()
+                    last_flush = now
+
+        if not update_markdown_stream:
+            sys.stdout.flush()
+        response = None
 
         # Save the time delay and text received
-        response_time = (time.monotonic_ns() - start_time) / 1e9
-        generated_text = "".join([m.get("content", "") for m in collected_messages])
+        response_time = time.perf_counter() - start_time
+        generated_text = "".join(generated_text_parts)
 
     else:
         # Extract and save the generated response
         generated_text = response["choices"][0]["message"]["content"]
 
         # Save the time delay
-        response_time = (time.monotonic_ns() - start_time) / 1e9
+        response_time = time.perf_counter() - start_time
 
     return (
         generated_text,
@@ -89,21 +111,25 @@ def chatgpt_request(
     )
 
 
-def num_tokens_from_string(string, model="gpt-3.5-turbo"):
-    """Returns the number of tokens in a text string."""
-    encoding = tiktoken.encoding_for_model(model)
-    num_tokens = len(encoding.encode(string))
-    return num_tokens
+@functools.lru_cache(maxsize=None)
+def _get_encoding(model):
+    """
+    Returns the tiktoken encoding for a model, built once per process.
 
+    Unknown models fall back to the cl100k_base encoding.
+    """
+    import tiktoken
 
-def num_tokens_from_messages(messages, model="gpt-3.5-turbo"):
-    """Returns the number of tokens used by a list of messages."""
     try:
-        encoding = tiktoken.encoding_for_model(model)
+        return tiktoken.encoding_for_model(model)
     except KeyError:
         print("Warning: model not found. Using cl100k_base encoding.")
-        encoding = tiktoken.get_encoding("cl100k_base")
+        return tiktoken.get_encoding("cl100k_base")
+
 
+@functools.lru_cache(maxsize=None)
+def _message_token_overhead(model):
+    """Returns (tokens_per_message, tokens_per_name) for a model."""
     if model == "gpt-3.5-turbo":
         tokens_per_message = 4  # every message follows <|start|>{role/name}\n{content}<|end|>\n
         tokens_per_name = -1  # if there's a name, the role is omitted
@@ -116,99 +142,129 @@ def num_tokens_from_messages(messages, model="gpt-3.5-turbo"):
             " https://github.com/openai/openai-python/blob/main/chatml.md for"
             " information on how messages are converted to tokens."
         )
-    num_tokens = 0
-    for message in messages:
-        num_tokens += tokens_per_message
-        for key, value in message.items():
-            num_tokens += len(encoding.encode(value))
-            if key == "name":
-                num_tokens += tokens_per_name
-    num_tokens += 3  # every reply is primed with <|start|>assistant<|message|>
+    return tokens_per_message, tokens_per_name
+
+
+def num_tokens_from_string(string, model="gpt-3.5-turbo"):
+    """Returns the number of tokens in a text string."""
+    encoding = _get_encoding(model)
+    # encode_ordinary skips the special-token scan; prompts are plain text.
+    num_tokens = len(encoding.encode_ordinary(string))
     return num_tokens
 
 
+def num_tokens_from_messages(messages, model="gpt-3.5-turbo"):
+    """Returns the number of tokens used by a list of messages."""
+    encoding = _get_encoding(model)
+    tokens_per_message, tokens_per_name = _message_token_overhead(model)
+
+    texts = []
+    name_count = 0
+    for message in messages:
+        texts.extend(message.values())
+        if "name" in message:
+            name_count += 1
+
+    # One Rust-side batch call instead of one encode per field; it
+    # releases the GIL and parallelizes across messages.
+    token_lists = encoding.encode_ordinary_batch(texts, num_threads=os.cpu_count() or 1)
+
+    # The leading 3: every reply is primed with <|start|>assistant<|message|>
+    return (
+        3
+        + tokens_per_message * len(messages)
+        + tokens_per_name * name_count
+        + sum(map(len, token_lists))
+    )
+
+
 def estimated_cost(num_tokens, price_per_1M_tokens):
     """Returns the estimated cost of a number of tokens."""
     return f"{num_tokens / 10**6 * price_per_1M_tokens:.6f}"
 
 
-def estimate_prompt_cost(message):
-    """Returns the estimated cost of a prompt."""
-    num_tokens = num_tokens_from_messages(message)
-
-    # Prices in USD per 1M tokens
-    prices = {
-        "gpt-3.5-turbo": 0.50,
-        "gpt-3.5-turbo-0125": 0.50,
-        "gpt-3.5-turbo-1106": 0.50,
-        "gpt-3.5-turbo-instruct": 1.50,
-        "gpt-4": 30,
-        "gpt-4-turbo-preview": 10,
-        "gpt-4-turbo": 10,
-        "gpt-4-turbo-2024-04-09": 0.01,
-        "gpt-4-0613": 0.03,
-        "gpt-4-1106-preview": 10,
-        "gpt-4-0125-preview": 10,
-        "gpt-4-32k": 60,
-        "gpt-4-32k-0613": 60,
-        "gpt-4o": 5,
-        "gpt-4o-2024-05-13": 5,
-    }
-
-    return {model: estimated_cost(num_tokens, price) for model, price in prices.items()}
+# Prices in USD per 1M tokens
+_PRICES = {
+    "gpt-3.5-turbo": 0.50,
+    "gpt-3.5-turbo-0125": 0.50,
+    "gpt-3.5-turbo-1106": 0.50,
+    "gpt-3.5-turbo-instruct": 1.50,
+    "gpt-4": 30,
+    "gpt-4-turbo-preview": 10,
+    "gpt-4-turbo": 10,
+    "gpt-4-turbo-2024-04-09": 0.01,
+    "gpt-4-0613": 0.03,
+    "gpt-4-1106-preview": 10,
+    "gpt-4-0125-preview": 10,
+    "gpt-4-32k": 60,
+    "gpt-4-32k-0613": 60,
+    "gpt-4o": 5,
+    "gpt-4o-2024-05-13": 5,
+}
+
+
+def estimate_prompt_cost(message, n_tokens=None):
+    """
+    Returns the estimated cost of a prompt for every known model.
+
+    Callers that have already counted the tokens can pass `n_tokens`
+    to skip a second tokenization pass.
+    """
+    num_tokens = n_tokens if n_tokens is not None else num_tokens_from_messages(message)
+
+    return {model: estimated_cost(num_tokens, price) for model, price in _PRICES.items()}
+
+
+def estimate_prompt_cost_for(message, model, n_tokens=None):
+    """
+    Returns the estimated cost of a prompt for a single model.
+    """
+    num_tokens = n_tokens if n_tokens is not None else num_tokens_from_messages(message)
+    return estimated_cost(num_tokens, _PRICES[model])
+
+
+# Built once at import so the handler below is a single write call.
+_RATE_LIMIT_HELP = (
+    "\n"
+    f"{BLUE}You might not have set a usage rate limit in your OpenAI account settings. {RESET}\n"
+    "If that's the case, you can set it"
+    " here:\nhttps://platform.openai.com/account/billing/limits\n"
+    "\n"
+    f"{BLUE}If you have set a usage rate limit, please try the following steps:{RESET}\n"
+    "- Wait a few seconds before trying again.\n"
+    "\n"
+    "- Reduce your request rate or batch tokens. You can read the"
+    " OpenAI rate limits"
+    " here:\nhttps://platform.openai.com/account/rate-limits\n"
+    "\n"
+    "- If you are using the free plan, you can upgrade to the paid"
+    " plan"
+    " here:\nhttps://platform.openai.com/account/billing/overview\n"
+    "\n"
+    "- If you are using the paid plan, you can increase your usage"
+    " rate limit"
+    " here:\nhttps://platform.openai.com/account/billing/limits\n"
+)
 
 
 def handle_rate_limit_error():
     """
     Provides guidance on how to handle a rate limit error.
     """
-    sys.stderr.write("\n")
-    sys.stderr.write(
-        BLUE
-        + "You might not have set a usage rate limit in your OpenAI account settings. "
-        + RESET
-        + "\n"
-    )
-    sys.stderr.write(
-        "If that's the case, you can set it"
-        " here:\nhttps://platform.openai.com/account/billing/limits" + "\n"
-    )
+    sys.stderr.write(_RATE_LIMIT_HELP)
 
-    sys.stderr.write("\n")
-    sys.stderr.write(
-        BLUE + "If you have set a usage rate limit, please try the following steps:" + RESET + "\n"
-    )
-    sys.stderr.write("- Wait a few seconds before trying again.\n")
-    sys.stderr.write("\n")
-    sys.stderr.write(
-        "- Reduce your request rate or batch tokens. You can read the"
-        " OpenAI rate limits"
-        " here:\nhttps://platform.openai.com/account/rate-limits" + "\n"
-    )
-    sys.stderr.write("\n")
-    sys.stderr.write(
-        "- If you are using the free plan, you can upgrade to the paid"
-        " plan"
-        " here:\nhttps://platform.openai.com/account/billing/overview" + "\n"
-    )
-    sys.stderr.write("\n")
-    sys.stderr.write(
-        "- If you are using the paid plan, you can increase your usage"
-        " rate limit"
-        " here:\nhttps://platform.openai.com/account/billing/limits" + "\n"
-    )
+
+_AUTHENTICATION_ERROR_MSG = (
+    f"{RED}Error:{RESET} Your API key or token is invalid, expired, or"
+    " revoked. Check your API key or token and make sure it is correct"
+    " and active.\n"
+    "\nYou may need to generate a new API key from your account"
+    " dashboard: https://platform.openai.com/account/api-keys\n"
+)
 
 
 def handle_authentication_error():
     """
     Provides guidance on how to handle an authentication error.
     """
-    sys.stderr.write(
-        f"{RED}Error:{RESET} Your API key or token is invalid, expired, or"
-        " revoked. Check your API key or token and make sure it is correct"
-        " and active.\n"
-    )
-    sys.stderr.write(
-        "\nYou may need to generate a new API key from your account"
-        " dashboard: https://platform.openai.com/account/api-keys\n"
-    )
+    sys.stderr.write(_AUTHENTICATION_ERROR_MSG)
@@ -1,14 +1,16 @@
+import functools
 import json
 import os
 import sys
+import time
 from pathlib import Path
 
 import click
-import openai
-from rich.console import Console
-from rich.live import Live
-from rich.markdown import Markdown
-from rich.theme import Theme
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from lmterminal import gpt_integration as openai_utils
 
@@ -34,13 +36,8 @@ def prepare_and_generate_response(
     """
     Handles the parameters.
     """
-    if not system:
-        system = ""
-
-    if template:
-        system, prompt_input, model_template = handle_template(
-            template, system, prompt_input, model
-        )
+    # handle_template is a pass-through when no template is selected.
+    system, prompt_input, model_template = handle_template(template, system, prompt_input, model)
 
     if not model:
         model = model_template
@@ -69,22 +66,24 @@ def prepare_and_generate_response(
     return content, response_time, response
 
 
+EMOJI_MESSAGE = (
+    "Add plenty of emojis as a colorful way to convey emotions. However, don't"
+    " mention it."
+)
+
+
 def add_emoji(system: str) -> str:
     """
     Adds an emoji to the system message.
     """
-    emoji_message = (
-        "Add plenty of emojis as a colorful way to convey emotions. However, don't"
-        " mention it."
-    )
     system = system.rstrip()
 
     if system == "":
-        return emoji_message
+        return EMOJI_MESSAGE
 
     if not system.endswith("."):
         system += "."
-    return system + " " + emoji_message
+    return system + " " + EMOJI_MESSAGE
 
 
 def get_config_path() -> Path:
@@ -98,18 +97,21 @@ def get_config_path() -> Path:
 def load_config() -> dict:
     """
     Loads the config file.
+
+    Uses orjson when installed; otherwise the stdlib json module.
     """
     config_path = get_config_path()
     config_path.parent.mkdir(parents=True, exist_ok=True)
     config_path.touch(exist_ok=True)
 
-    try:
-        with open(config_path, "r", encoding="UTF-8") as file:
-            config = json.load(file)
-    except json.decoder.JSONDecodeError:
-        config = {}
+    data = config_path.read_bytes()
+    if not data:
+        return {}
 
-    return config
+    try:
+        return orjson.loads(data) if orjson is not None else json.loads(data)
+    except ValueError:
+        return {}
 
 
 def save_config(config: dict) -> None:
@@ -117,30 +119,61 @@ def save_config(config: dict) -> None:
     Saves the config file.
     """
     config_path = get_config_path()
-    with open(config_path, "w", encoding="UTF-8") as config_path:
-        json.dump(config, config_path, indent=4)
+    if orjson is not None:
+        data = orjson.dumps(config, option=orjson.OPT_INDENT_2)
+    else:
+        data = json.dumps(config, indent=4).encode("UTF-8")
+    config_path.write_bytes(data)
 
 
-def get_markdown_code_block_theme() -> str:
+@functools.lru_cache(maxsize=1)
+def _get_config() -> dict:
     """
-    Gets the markdown code block theme from the config file.
+    Loads the config file once per process.
     """
-    config = load_config()
-    config.setdefault("code_block_theme", "monokai")
-    save_config(config)
+    return load_config()
 
-    return config["code_block_theme"]
 
+def get_markdown_themes() -> tuple:
+    """
+    Gets the markdown code block and inline code themes from the config file.
 
-def get_markdown_inline_code_theme() -> str:
+    The config is read once per process and only written back when a
+    default had to be inserted.
     """
-    Gets the markdown inline code theme from the config file.
+    config = _get_config()
+    missing_keys = "code_block_theme" not in config or "inline_code_theme" not in config
+
+    code_block_theme = config.setdefault("code_block_theme", "monokai")
+    inline_code_theme = config.setdefault("inline_code_theme", "blue on black")
+
+    if missing_keys:
+        save_config(config)
+
+    return code_block_theme, inline_code_theme
+
+
+def find_last_block_boundary(text: str, start: int = 0) -> int:
     """
-    config = load_config()
-    config.setdefault("inline_code_theme", "blue on black")
-    save_config(config)
+    Finds the index just past the last blank line that closes a top-level
+    Markdown block in `text[start:]`.
 
-    return config["inline_code_theme"]
+    Blank lines inside fenced code blocks do not count as boundaries.
+    Returns `start` when no block has been completed yet.
+    """
+    boundary = start
+    inside_code_fence = False
+    offset = start
+
+    for line in text[start:].splitlines(keepends=True):
+        stripped = line.strip()
+        if stripped.startswith("```") or stripped.startswith("~~~"):
+            inside_code_fence = not inside_code_fence
+        elif not stripped and not inside_code_fence and line.endswith("\n"):
+            boundary = offset + len(line)
+        offset += len(line)
+
+    return boundary
 
 
 def generate_response(
@@ -153,6 +186,14 @@ def generate_response(
     """
     Generates a response from a ChatGPT.
     """
+    # Imported here so that subcommands that never talk to the API
+    # (templates, key, --help) don't pay for these imports.
+    import openai
+    from rich.console import Console, Group
+    from rich.live import Live
+    from rich.markdown import Markdown
+    from rich.theme import Theme
+
     openai.api_key = get_api_key()
 
     if not openai.api_key:
@@ -164,25 +205,56 @@ def generate_response(
         sys.exit(1)
 
     # Theming for Rich Markdown
-    code_block_theme = get_markdown_code_block_theme()
-    inline_code_theme = get_markdown_inline_code_theme()
+    code_block_theme, inline_code_theme = get_markdown_themes()
     custom_theme = Theme({"markdown.code": inline_code_theme})
 
     console = Console(theme=custom_theme)
-    markdown_stream = ""
-    with Live(markdown_stream, console=console, refresh_per_second=25) as live:
+    chunks = []
+    with Live("", console=console, refresh_per_second=25) as live:
+        # Already-completed Markdown blocks are rendered once and cached so
+        # that each new chunk only pays for re-parsing the tail block.
+        finalized_blocks = []
+        finalized_length = 0
+        last_render = 0.0
+        pending_chunks = 0
+
+        def render_markdown_stream(force: bool = False) -> None:
+            nonlocal finalized_length, last_render, pending_chunks
+            now = time.monotonic()
+            # Coalesce fast token arrivals: render every 40 ms or every
+            # 16 buffered chunks, whichever comes first.
+            if not force and now - last_render < 0.04 and pending_chunks < 16:
+                return
+            last_render = now
+            pending_chunks = 0
+
+            markdown_stream = "".join(chunks)
+            boundary = find_last_block_boundary(markdown_stream, finalized_length)
+            if boundary > finalized_length:
+                finalized_blocks.append(
+                    Markdown(
+                        markdown_stream[finalized_length:boundary],
+                        code_theme=code_block_theme,
+                    )
+                )
+                finalized_length = boundary
+
+            tail = Markdown(
+                markdown_stream[finalized_length:],
+                code_theme=code_block_theme,
+            )
+            live.update(Group(*finalized_blocks, tail))
+
         # Allows rich markdown formatted stream in real time
         def update_markdown_stream(chunk: str) -> None:
-            nonlocal markdown_stream
-            markdown_stream += chunk
+            nonlocal pending_chunks
+            chunks.append(chunk)
             if raw:
-                print(chunk, end="")
+                sys.stdout.write(chunk)
+                sys.stdout.flush()
             else:
-                rich_markdown_stream = Markdown(
-                    markdown_stream,
-                    code_theme=code_block_theme,
-                )
-                live.update(rich_markdown_stream)
+                pending_chunks += 1
+                render_markdown_stream()
 
         try:
             content, response_time, response = openai_utils.chatgpt_request(
@@ -194,6 +266,10 @@ def generate_response(
                 update_markdown_stream=update_markdown_stream,
             )
 
+            # Render the chunks that the 40 ms coalescing window held back.
+            if stream and not raw:
+                render_markdown_stream(force=True)
+
             # This is temporary to ensure that the last line always ends with a newline
             # This will be removed when refactored
             if not content.endswith("\n"):
@@ -226,35 +302,35 @@ def display_debug_information(prompt, model, temperature):
     """
     Displays debug information.
     """
-    click.echo("---\n" + click.style("Debug information:", fg="yellow"), err=True)
-    click.echo(err=True)
+    lines = ["---\n" + click.style("Debug information:", fg="yellow"), ""]
 
-    click.echo(click.style("Prompt:", fg="red"), nl=False, err=True)
+    lines.append(click.style("Prompt:", fg="red"))
     for role in prompt:
-        click.echo(err=True)
-        click.echo(click.style(f"{role['role']}:", fg="blue"), err=True)
-        click.echo(f"{role}", err=True)
-    click.echo(err=True)
+        lines.append(click.style(f"{role['role']}:", fg="blue"))
+        lines.append(f"{role}")
+    lines.append("")
 
-    click.echo(click.style("Model:", fg="red"), err=True)
-    click.echo(f"{model=}", err=True)
-    click.echo(err=True)
+    lines.append(click.style("Model:", fg="red"))
+    lines.append(f"{model=}")
+    lines.append("")
 
-    click.echo(click.style("Temperature:", fg="red"), err=True)
-    click.echo(f"{temperature=}", err=True)
-    click.echo(err=True)
+    lines.append(click.style("Temperature:", fg="red"))
+    lines.append(f"{temperature=}")
+    lines.append("")
 
-    click.echo(click.style("End of debug information.", fg="yellow"), err=True)
-    click.echo("---\n", err=True)
+    lines.append(click.style("End of debug information.", fg="yellow"))
+    lines.append("---\n")
+
+    click.echo("\n".join(lines), err=True)
 
 
 def display_tokens_count_and_cost(prompt, model):
     """
     Displays the number of tokens in the prompt and the cost of the prompt.
     """
-    full_prompt = prompt[0]["content"] + prompt[1]["content"]
+    full_prompt = "".join(message["content"] for message in prompt)
     number_of_tokens = openai_utils.num_tokens_from_string(full_prompt, model)
-    cost = openai_utils.estimate_prompt_cost(prompt)[model]
+    cost = openai_utils.estimate_prompt_cost_for(prompt, model, n_tokens=number_of_tokens)
 
     click.echo(
         "Number of tokens in the prompt:"
@@ -271,18 +347,28 @@ def display_tokens_count_and_cost(prompt, model):
     sys.exit(0)
 
 
+# The key is effectively immutable for the lifetime of a process;
+# write_key refreshes this cache when the user changes it.
+_API_KEY = None
+
+
 def get_api_key() -> str:
     """
     Return the OpenAI API key.
     """
-    key_file_path = get_api_key_path()
-    with open(key_file_path, "r", encoding="UTF-8") as key_file:
-        return key_file.read().strip()
+    global _API_KEY
+    if _API_KEY is None:
+        _API_KEY = get_api_key_path().read_text(encoding="UTF-8").strip()
+    return _API_KEY
 
 
+@functools.lru_cache(maxsize=1)
 def get_api_key_path() -> Path:
     """
     Return the path to the keys file.
+
+    Cached so only the first call per process pays for the existence
+    check and directory creation.
     """
     key_file_path = Path.home() / ".config" / "lmt" / "key.env"
     if not key_file_path.exists():
@@ -295,9 +381,11 @@ def write_key(key: str) -> None:
     """
     Write the OpenAI API key to the key file.
     """
+    global _API_KEY
     key_file_path = get_api_key_path()
     with open(key_file_path, "w", encoding="UTF-8") as key_file:
         key_file.write(key)
+    _API_KEY = key.strip()
 
 
 def set_key() -> None:
@@ -1,14 +1,23 @@
+import functools
+import hashlib
+import os
+import pickle
 import sys
 from pathlib import Path
 
 import click
-import yaml
 
 
 def handle_template(template: str, system: str, prompt_input: str, model: str) -> tuple:
     """
     Handles the template used for the prompt.
+
+    Without a template there is nothing to read or parse, so the
+    inputs pass through untouched.
     """
+    if not template:
+        return system or "", prompt_input or "", model
+
     template_content = get_template_content(template)
     system = update_from_template(template_content, "system", system)
     prompt_input = update_from_template(template_content, "user", prompt_input)
@@ -19,60 +28,199 @@ def handle_template(template: str, system: str, prompt_input: str, model: str) -
 
 def update_from_template(template_content, key, value):
     """
-    Updates the value of a key from a template.
-    """
-    existing_value = template_content.setdefault(key, "")
-    if existing_value is None:
-        template_content[key] = existing_value = ""
+    Returns the template's value for a key with the user's input appended.
 
-    return existing_value.rstrip() + (value or "")
+    Pure: does not mutate `template_content`, so cached template dicts
+    can be shared safely. The loader guarantees "system" and "user" are
+    present and already rstripped.
+    """
+    return template_content[key] + (value or "")
 
 
 def get_template_content(template):
     """
     Reads the template YAML file and returns a dictionary with its content.
+
+    Parsed templates are cached in memory for the process and on disk
+    keyed by the file's path, mtime and size, so repeat invocations skip
+    the YAML parsing entirely.
     """
     template_file = TEMPLATES_DIR / f"{template}.yaml"
 
     try:
-        with open(template_file, "rt", encoding="UTF-8") as file:
-            template_content = yaml.safe_load(file)
+        stats = template_file.stat()
     except FileNotFoundError:
         click.echo(
             click.style("Error: ", fg="red")
             + f"The template '{click.style(template, fg='red')}' does not exist."
         )
         sys.exit(1)
-    else:
-        return template_content
+
+    template_content = _load_template(str(template_file), stats.st_mtime_ns, stats.st_size)
+    if isinstance(template_content, dict):
+        # Copy so that callers mutating the result don't poison the cache.
+        return dict(template_content)
+    return template_content
+
+
+@functools.lru_cache(maxsize=64)
+def _load_template(template_file: str, mtime_ns: int, size: int):
+    """
+    Parses a template file, memoized on (path, mtime, size).
+
+    A stale mtime or size is a different key, so edited templates are
+    re-parsed while unchanged ones hit the in-memory cache.
+    """
+    template_file = Path(template_file)
+
+    template_content = None
+    cache_file = get_template_cache_file(template_file, mtime_ns, size)
+    if cache_file.exists():
+        try:
+            with open(cache_file, "rb") as file:
+                template_content = pickle.load(file)
+        except (pickle.UnpicklingError, EOFError, OSError):
+            template_content = None
+
+    if template_content is None:
+        # Imported here so that commands that never parse a template
+        # don't pay for the yaml import.
+        import yaml
+
+        try:
+            from yaml import CSafeLoader as SafeLoader
+        except ImportError:
+            from yaml import SafeLoader
+
+        # Binary mode: the loader decodes UTF-8 itself (in C when libyaml
+        # is available). One read hands the parser a single buffer rather
+        # than having it pull from the stream in small chunks.
+        with open(template_file, "rb") as file:
+            data = file.read()
+        template_content = yaml.load(data, Loader=SafeLoader)
+
+        with open(cache_file, "wb") as file:
+            pickle.dump(template_content, file)
+
+    if isinstance(template_content, dict):
+        # Normalized once here so per-prompt code never rstrips or
+        # handles missing keys again.
+        for key in ("system", "user"):
+            template_content[key] = (template_content.get(key) or "").rstrip()
+
+    return template_content
+
+
+def load_all_templates() -> dict:
+    """
+    Returns {name: content} for every template.
+
+    Each template goes through `get_template_content`, so bulk consumers
+    (e.g. listing templates with their models) get the same caching and
+    system/user normalization as single lookups.
+    """
+    return {name: get_template_content(name) for name in get_template_names()}
+
+
+def get_template_cache_file(template_file: Path, mtime_ns: int, size: int) -> Path:
+    """
+    Returns the cache file path for a template and its stat signature.
+    """
+    fingerprint = f"{template_file}:{mtime_ns}:{size}"
+    digest = hashlib.blake2b(fingerprint.encode("UTF-8"), digest_size=16).hexdigest()
+    return get_templates_cache_dir() / f"{digest}.pickle"
+
+
+def get_templates_cache_dir() -> Path:
+    """
+    Returns the path to the parsed-templates cache directory.
+    """
+    cache_dir = Path.home() / ".cache" / "lmt" / "templates"
+    ensure_dir(cache_dir)
+    return cache_dir
+
+
+_ENSURED_DIRS = set()
+
+
+def ensure_dir(path: Path) -> None:
+    """
+    Creates the directory once per process; later calls are no-ops.
+
+    A stat (usually answered from the kernel's cache) is tried before
+    mkdir, so the common already-exists case never issues a mkdir call.
+    """
+    if path not in _ENSURED_DIRS:
+        if not path.exists():
+            path.mkdir(parents=True, exist_ok=True)
+        _ENSURED_DIRS.add(path)
+
+
+# Sorted template names for the current process, keyed by the templates
+# directory's mtime so edits and additions invalidate the listing.
+_names_cache = (None, ())
+
+
+def get_template_names() -> tuple:
+    """
+    Returns the sorted template names, rescanning only when the
+    templates directory has changed.
+    """
+    global _names_cache
+    mtime_ns = os.stat(get_templates_dir()).st_mtime_ns
+    if _names_cache[0] != mtime_ns:
+        with os.scandir(TEMPLATES_DIR) as entries:
+            names = sorted(
+                entry.name[: -len(".yaml")] for entry in entries if entry.name.endswith(".yaml")
+            )
+        _names_cache = (mtime_ns, tuple(names))
+    return _names_cache[1]
 
 
 def get_templates_dir() -> Path:
     """
-    Returns the path to the templates directory.
+    Returns the path to the templates directory, creating it if needed.
     """
-    templates_dir = Path.home() / ".config" / "lmt" / "templates"
-    templates_dir.mkdir(parents=True, exist_ok=True)
-    return templates_dir
+    ensure_dir(TEMPLATES_DIR)
+    return TEMPLATES_DIR
+
+
+# Set once the default template is known to exist; later calls skip
+# the directory and file existence checks entirely.
+_default_template_file = None
 
 
 def get_default_template_file_path() -> Path:
     """
     Returns the path to the default template file.
     """
-    default_dir = Path.home() / ".config" / "lmt" / "default"
-    default_dir.mkdir(parents=True, exist_ok=True)
+    global _default_template_file
+    if _default_template_file is not None:
+        return _default_template_file
+
+    default_dir = _LMT_ROOT / "default"
+    ensure_dir(default_dir)
 
     default_template_file = default_dir / "template.yaml"
     if not default_template_file.exists():
         click.echo("The default template does not exist. Creating it...")
-        with open(default_template_file, "w", encoding="UTF-8") as file:
-            file.write(DEFAULT_TEMPLATE_CONTENT)
+        # Written to a temp file and renamed so an interrupted write
+        # can't leave a truncated default template behind.
+        tmp_file = default_template_file.with_suffix(".yaml.tmp")
+        tmp_file.write_text(DEFAULT_TEMPLATE_CONTENT, encoding="UTF-8")
+        os.replace(tmp_file, default_template_file)
 
+    _default_template_file = default_template_file
     return default_template_file
 
 
-TEMPLATES_DIR = get_templates_dir()
+# Built once: every path under ~/.config/lmt derives from this root, so
+# Path.home() and the intermediate Path allocations happen a single time.
+_LMT_ROOT = Path.home() / ".config" / "lmt"
+
+# The directory is only created when a command actually needs it
+# (see `get_templates_dir`), not at import time.
+TEMPLATES_DIR = _LMT_ROOT / "templates"
 
 DEFAULT_TEMPLATE_CONTENT = """# Documentation: https://github.com/sderev/lmt
 
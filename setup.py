@@ -4,8 +4,9 @@ VERSION = "0.0.34"
 
 
 def read_requirements():
-    with open("requirements.txt") as file:
-        return list(file)
+    with open("requirements.txt", encoding="utf8") as file:
+        lines = file.read().splitlines()
+    return [line for line in lines if line.strip() and not line.startswith("#")]
 
 
 def get_long_description():